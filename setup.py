@@ -12,5 +12,6 @@ setup(
         'pydantic',
         'numpy',
         'pandas',    
+        'pypdf',
     ],
 ) 
\ No newline at end of file
@@ -3,5 +3,7 @@ This package contains various agent implementations.
 """
 
 from .base_agent import BaseAgent
+from .guideline_ingestion import GuidelineIngestor
+from .verdict_store import VerdictStore
 
-__all__ = ['BaseAgent']
\ No newline at end of file
+__all__ = ['BaseAgent', 'GuidelineIngestor', 'VerdictStore']
\ No newline at end of file
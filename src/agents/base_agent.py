@@ -1,10 +1,41 @@
+import hashlib
+import math
 import os
-from typing import Any, Dict, List
-from pydantic import BaseModel
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from pydantic import BaseModel, PrivateAttr
 from langchain_openai import ChatOpenAI
 from langchain.memory import ConversationBufferMemory
 from langchain_core.prompts import ChatPromptTemplate
 
+# Words that carry no signal for matching ads to guideline examples
+STOPWORDS = {
+    "a", "an", "and", "any", "are", "as", "at", "be", "by", "can", "do", "does",
+    "for", "from", "has", "have", "how", "i", "if", "in", "into", "is", "it",
+    "its", "my", "of", "on", "or", "our", "so", "such", "that", "the", "their",
+    "them", "there", "these", "they", "this", "to", "was", "we", "were", "what",
+    "when", "where", "which", "who", "why", "will", "with", "you", "your"
+}
+
+def extract_terms(text: str) -> Set[str]:
+    """Lowercase word stems of a text, without stopwords."""
+    terms = set()
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        # Crude plural folding so "CTAs" matches "CTA"
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.add(word)
+    return terms
+
+def knowledge_key(example: Dict[str, str]) -> str:
+    """Identify a training example: its chunk id, or a hash of its content."""
+    if example.get("chunk_id"):
+        return example["chunk_id"]
+    content = example["input"] + "\n" + example["output"]
+    return "example:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
 class BaseAgent(BaseModel):
     """Base class for all trainable LLM agents."""
     name: str
@@ -17,6 +48,8 @@ class BaseAgent(BaseModel):
                 ("human", "{input}")
             ])
     training_data: List[Dict[str, str]] = []
+    _knowledge_listeners: List[Callable[[List[str]], None]] = PrivateAttr(default_factory=list)
+    _retrieval_index: Optional[Tuple] = PrivateAttr(default=None)
     
     def __init__(self, **data):
         # Initialize the base model with all data first
@@ -106,6 +139,7 @@ class BaseAgent(BaseModel):
     def train(self, training_data: List[Dict[str, str]]) -> None:
         """Train the agent with specific examples."""
         self.training_data.extend(training_data)
+        self._notify_knowledge_listeners([knowledge_key(d) for d in training_data])
         
         # Create a training prompt with examples
         training_prompt = self.prompt_template.format_messages(
@@ -125,9 +159,12 @@ class BaseAgent(BaseModel):
     def inject_knowledge(self, init_prompt: str, complete_prompt: str, knowledge_init: str, knowledge_complete: str) -> None:
         """Inject additional or initial knowledge into the agent."""
 
-        self.training_data.append({
-            "input": init_prompt + "\n" + complete_prompt,
-            "output": knowledge_init + "\n" + knowledge_complete
+        # Keyed by topic so that re-injecting a topic replaces its old version
+        self.update_knowledge_chunks({
+            f"knowledge:{init_prompt}": {
+                "input": init_prompt + "\n" + complete_prompt,
+                "output": knowledge_init + "\n" + knowledge_complete
+            }
         })
 
         # Create the knowledge prompt
@@ -138,11 +175,60 @@ class BaseAgent(BaseModel):
 
         # Inject the knowledge into the agent
         self.llm(knowledge_prompt)
-    
+
+    def update_knowledge_chunks(self, upserts: Dict[str, Dict[str, str]], removals: List[str] = None) -> None:
+        """Replace, add or drop keyed knowledge chunks in the retrieval corpus.
+
+        Chunks live in training_data like any other example, tagged with a
+        "chunk_id" key. Only the given ids are touched, in a single pass, and
+        no LLM call is made. Knowledge listeners are notified with the ids
+        whose content actually changed.
+        """
+        removed = set(removals or [])
+        pending = dict(upserts)
+        touched = []
+
+        kept = []
+        for d in self.training_data:
+            chunk_id = d.get("chunk_id")
+            if chunk_id in removed:
+                touched.append(chunk_id)
+                continue
+            if chunk_id in pending:
+                entry = {**pending.pop(chunk_id), "chunk_id": chunk_id}
+                if entry != d:
+                    touched.append(chunk_id)
+                d = entry
+            kept.append(d)
+
+        for chunk_id, entry in pending.items():
+            kept.append({**entry, "chunk_id": chunk_id})
+            touched.append(chunk_id)
+
+        self.training_data = kept
+
+        self._notify_knowledge_listeners(touched)
+
+    def add_knowledge_listener(self, listener: Callable[[List[str]], None]) -> None:
+        """Call listener with the changed example keys whenever knowledge changes."""
+        self._knowledge_listeners.append(listener)
+
+    def _notify_knowledge_listeners(self, keys: List[str]) -> None:
+        """Tell knowledge listeners which examples were added, changed or removed."""
+        if keys:
+            for listener in self._knowledge_listeners:
+                listener(keys)
+
     def process_input(self, input_text: str) -> str:
         """Process input with specialized handling."""
+        response, _ = self.process_input_with_sources(input_text)
+        return response
+
+    def process_input_with_sources(self, input_text: str) -> Tuple[str, List[Dict[str, str]]]:
+        """Process input and also return the training examples used as context."""
         # Add context from training data if relevant
-        context = self._get_relevant_context(input_text)
+        examples = self.get_relevant_examples(input_text)
+        context = self._format_context(examples)
         
         # Format the prompt with context
         messages = self.prompt_template.format_messages(
@@ -152,18 +238,67 @@ class BaseAgent(BaseModel):
         # Generate response
         response = self.llm(messages)
 
-        return response.content
+        return response.content, examples
+
+    def get_relevant_examples(self, input_text: str, limit: int = 3) -> List[Dict[str, str]]:
+        """Get the training examples most relevant to an input.
+
+        Examples are ranked by the IDF-weighted cosine similarity between the
+        input's terms and the terms of the example's input and output, so
+        words shared by most of the corpus count for little and long
+        examples do not win just by containing more words.
+        """
+        query = extract_terms(input_text)
+        corpus, example_terms, idf, norms = self._get_retrieval_index()
+        if not query or not corpus:
+            return []
+
+        query_norm = math.sqrt(sum(idf.get(t, 0) ** 2 for t in query)) or 1.0
+
+        scored = []
+        for position, (d, terms) in enumerate(zip(corpus, example_terms)):
+            shared = query & terms
+            if not shared:
+                continue
+            score = sum(idf[t] ** 2 for t in shared) / (query_norm * norms[position])
+            scored.append((-score, position, d))
+
+        return [d for _, _, d in sorted(scored, key=lambda s: s[:2])[:limit]]
     
+    def _get_retrieval_index(self) -> Tuple:
+        """Term sets, IDF weights and norms for the current training data.
+
+        The corpus is read once and the result cached until the list is
+        replaced or grows, so concurrent updates cannot pair examples with
+        another example's terms and repeated lookups do not re-tokenize.
+        """
+        corpus = self.training_data
+        index = self._retrieval_index
+        if index is not None and index[0] is corpus and index[1] == len(corpus):
+            return (corpus,) + index[2:]
+
+        example_terms = [extract_terms(d['input'] + " " + d['output']) for d in corpus]
+        document_frequency: Dict[str, int] = {}
+        for terms in example_terms:
+            for term in terms:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        idf = {
+            term: math.log(1 + len(corpus) / df)
+            for term, df in document_frequency.items()
+        }
+        norms = [math.sqrt(sum(idf[t] ** 2 for t in terms)) for terms in example_terms]
+
+        self._retrieval_index = (corpus, len(corpus), example_terms, idf, norms)
+        return corpus, example_terms, idf, norms
+
     def _get_relevant_context(self, input_text: str) -> str:
         """Get relevant context from training data."""
-        # Simple implementation - in a real scenario, you would use
-        # more sophisticated similarity matching
-        relevant_examples = [
-            d for d in self.training_data 
-            if any(word in input_text.lower() for word in d['input'].lower().split())
-        ]
+        return self._format_context(self.get_relevant_examples(input_text))
+
+    def _format_context(self, examples: List[Dict[str, str]]) -> str:
+        """Format training examples as prompt context."""
         return "\n".join([f"Example: {d['input']} -> {d['output']}" 
-                         for d in relevant_examples[:3]]) 
+                         for d in examples]) 
     
     # Possibly separate process - or separate agent
     def extract_text_from_images(image_paths, prompt=None):
@@ -0,0 +1,232 @@
+"""Incremental ingestion of guideline PDFs into an agent's retrieval corpus."""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List
+from pydantic import BaseModel
+
+from .base_agent import BaseAgent
+
+SECTION_PATTERN = re.compile(r"^\s*(\d+)[.)]\s+(.*)$")
+RULE_PATTERN = re.compile(r"^\s*([a-z])[.)]\s+(.*)$")
+PAGE_NUMBER_PATTERN = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+
+# Lines this close to the top or bottom of a page are header/footer candidates
+PAGE_EDGE_LINES = 3
+
+
+class GuidelineChunk(BaseModel):
+    """A single section intro or rule taken from a guideline document."""
+    chunk_id: str
+    section: str
+    content: str
+    content_hash: str
+
+
+def content_hash(text: str) -> str:
+    """Hash chunk text, ignoring whitespace differences from PDF extraction."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def extract_pdf_text(pdf_path: str) -> str:
+    """Extract the text of a PDF locally, with pages separated by form feeds."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return "\f".join(page.extract_text() or "" for page in reader.pages)
+
+
+def strip_page_furniture(text: str) -> List[str]:
+    """
+    Return the content lines of form-feed separated pages.
+
+    Headers and footers are lines near the top or bottom of a page that
+    repeat on more than one page (e.g. "Confidential"), plus bare page
+    numbers. Both are dropped so they do not end up in a rule's content.
+    """
+    pages = [[line.strip() for line in page.splitlines() if line.strip()] for page in text.split("\f")]
+
+    edge_counts: Dict[str, int] = {}
+    for lines in pages:
+        for line in set(lines[:PAGE_EDGE_LINES] + lines[-PAGE_EDGE_LINES:]):
+            edge_counts[line] = edge_counts.get(line, 0) + 1
+    furniture = {line for line, count in edge_counts.items() if count > 1}
+
+    content = []
+    for lines in pages:
+        edges = set(lines[:PAGE_EDGE_LINES] + lines[-PAGE_EDGE_LINES:])
+        for line in lines:
+            if line in edges and (line in furniture or PAGE_NUMBER_PATTERN.match(line)):
+                continue
+            content.append(line)
+    return content
+
+
+def chunk_guidelines(text: str, doc_id: str) -> List[GuidelineChunk]:
+    """
+    Split guideline text into one chunk per rule.
+
+    Page headers and footers are dropped first. Numbered lines ("1. Examples
+    of ...") then open a section and lettered lines ("a. Ad must not ...")
+    open a rule within it. Lines that match neither are appended to the
+    current rule, or to the section intro when no rule has started yet.
+    Chunk ids are positional, "<doc_id>#<section>.<rule>" with "_" as the
+    rule for a section intro; GuidelineIngestor keeps the ids of rules that
+    merely moved between versions.
+    """
+    chunks: Dict[str, Dict[str, str]] = {}
+    section_no, section_title, rule = "0", "", "_"
+
+    for line in strip_page_furniture(text):
+        section_match = SECTION_PATTERN.match(line)
+        rule_match = RULE_PATTERN.match(line)
+        if section_match:
+            section_no, section_title, rule = section_match.group(1), section_match.group(2), "_"
+            line = section_title
+        elif rule_match:
+            rule = rule_match.group(1)
+            line = rule_match.group(2)
+
+        chunk_id = f"{doc_id}#{section_no}.{rule}"
+        if chunk_id in chunks:
+            chunks[chunk_id]["content"] += " " + line
+        else:
+            chunks[chunk_id] = {"section": section_title, "content": line}
+
+    return [
+        GuidelineChunk(
+            chunk_id=chunk_id,
+            section=chunk["section"],
+            content=chunk["content"],
+            content_hash=content_hash(chunk["section"] + "\n" + chunk["content"])
+        )
+        for chunk_id, chunk in chunks.items()
+    ]
+
+
+class GuidelineIngestor(BaseModel):
+    """
+    Keeps guideline documents and an agent's retrieval corpus in sync.
+
+    The index file records, per document, the hash of the raw file and the
+    content hash of every chunk. A document whose bytes are unchanged is
+    skipped before it is parsed; otherwise new chunks are matched to stored
+    ones by content hash first, so rules that only moved keep their id and
+    count as unchanged, and by position second. Only chunks that were
+    added, edited or removed are re-indexed into the agent.
+    """
+    index_path: str = "guideline_index.json"
+    index: Dict[str, Dict] = {}
+
+    def __init__(self, **data):
+        super().__init__(**data)
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                self.index = json.load(f)
+
+    def save_index(self) -> None:
+        """Write the chunk index to disk."""
+        with open(self.index_path, 'w') as f:
+            json.dump(self.index, f, indent=2)
+
+    def load_corpus(self, agent: BaseAgent) -> None:
+        """Load every indexed chunk into an agent, e.g. after a restart."""
+        upserts = {}
+        for doc in self.index.values():
+            for chunk_id, chunk in doc["chunks"].items():
+                upserts[chunk_id] = self._to_example(chunk)
+        agent.update_knowledge_chunks(upserts)
+
+    def ingest(self, pdf_path: str, agent: BaseAgent, doc_id: str) -> Dict[str, List[str]]:
+        """
+        Ingest a guideline PDF, re-indexing only the chunks that changed.
+
+        The doc_id must stay the same across versions of a document, e.g.
+        "rsoc" rather than the file name, which carries the version date.
+        A new version ingested under a new doc_id is treated as a separate
+        document; use remove_document to retire the old one.
+        """
+        with open(pdf_path, 'rb') as f:
+            file_hash = hashlib.sha256(f.read()).hexdigest()
+
+        previous = self.index.get(doc_id, {"file_hash": None, "chunks": {}})
+        if previous["file_hash"] == file_hash:
+            return {"added": [], "changed": [], "removed": []}
+
+        return self.ingest_text(extract_pdf_text(pdf_path), agent, doc_id, file_hash)
+
+    def ingest_text(self, text: str, agent: BaseAgent, doc_id: str, file_hash: str = None) -> Dict[str, List[str]]:
+        """Ingest already extracted guideline text, re-indexing only changed chunks."""
+        previous = self.index.get(doc_id, {"file_hash": None, "chunks": {}})["chunks"]
+        chunks = self._match_previous(chunk_guidelines(text, doc_id), previous)
+
+        added = [cid for cid in chunks if cid not in previous]
+        changed = [
+            cid for cid in chunks
+            if cid in previous and previous[cid]["content_hash"] != chunks[cid].content_hash
+        ]
+        removed = [cid for cid in previous if cid not in chunks]
+
+        stored = {cid: chunk.model_dump(exclude={"chunk_id"}) for cid, chunk in chunks.items()}
+        agent.update_knowledge_chunks(
+            {cid: self._to_example(stored[cid]) for cid in added + changed},
+            removed
+        )
+
+        self.index[doc_id] = {"file_hash": file_hash or content_hash(text), "chunks": stored}
+        self.save_index()
+
+        return {"added": added, "changed": changed, "removed": removed}
+
+    def remove_document(self, doc_id: str, agent: BaseAgent) -> List[str]:
+        """Drop a retired document from the index and the agent's corpus."""
+        doc = self.index.pop(doc_id, None)
+        if doc is None:
+            return []
+
+        removed = list(doc["chunks"])
+        agent.update_knowledge_chunks({}, removed)
+        self.save_index()
+        return removed
+
+    def _match_previous(self, chunks: List[GuidelineChunk], previous: Dict[str, Dict]) -> Dict[str, GuidelineChunk]:
+        """
+        Assign ids to freshly parsed chunks, reusing stored ids where possible.
+
+        A chunk whose content hash matches a stored chunk takes that chunk's
+        id. A chunk with new content takes the id of the stored chunk that
+        followed its predecessor, so a rule edited in place reads as changed,
+        then its positional id, then a hash-suffixed one if that is taken.
+        The result is in document order.
+        """
+        order = list(previous)
+        successor = dict(zip([None] + order, order))
+        unclaimed: Dict[str, List[str]] = {}
+        for chunk_id in order:
+            unclaimed.setdefault(previous[chunk_id]["content_hash"], []).append(chunk_id)
+
+        ids: List[str] = []
+        for chunk in chunks:
+            ids.append(unclaimed[chunk.content_hash].pop(0) if unclaimed.get(chunk.content_hash) else None)
+        taken = set(filter(None, ids))
+
+        for i, chunk in enumerate(chunks):
+            if ids[i] is not None:
+                continue
+            candidates = [successor.get(ids[i - 1] if i else None), chunk.chunk_id]
+            chunk_id = next((c for c in candidates if c and c not in taken), None)
+            ids[i] = chunk_id or f"{chunk.chunk_id}~{chunk.content_hash[:8]}"
+            taken.add(ids[i])
+
+        return {
+            chunk_id: chunk.model_copy(update={"chunk_id": chunk_id})
+            for chunk_id, chunk in zip(ids, chunks)
+        }
+
+    def _to_example(self, chunk: Dict[str, str]) -> Dict[str, str]:
+        """Shape a stored chunk like a training example, keyed by the rule text."""
+        return {"input": chunk["content"], "output": chunk["section"]}
@@ -0,0 +1,270 @@
+"""Persistent compliance verdicts with targeted re-audit on guideline changes."""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Set
+from pydantic import BaseModel, PrivateAttr
+
+from .base_agent import BaseAgent, extract_terms, knowledge_key
+
+
+def _hash(text: str) -> str:
+    """Hash text for change detection."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _context_hash(examples: List[Dict[str, str]]) -> str:
+    """Hash the retrieved context a verdict was evaluated against."""
+    return _hash("\n".join(f"{d['input']} -> {d['output']}" for d in examples))
+
+
+def _rule_hashes(agent: BaseAgent) -> Dict[str, str]:
+    """Map every example in an agent's corpus to a hash of its content."""
+    return {knowledge_key(d): _hash(d["input"] + "\n" + d["output"]) for d in agent.training_data}
+
+
+class Verdict(BaseModel):
+    """A stored verdict and the guideline context it was based on."""
+    ad_id: str
+    input_text: str
+    verdict: str
+    rule_ids: List[str]
+    context_hash: str
+    timestamp: str
+
+
+class VerdictStore(BaseModel):
+    """
+    Stores verdicts together with the rules they depended on.
+
+    A reverse index maps each rule (knowledge chunk id) to the ads whose
+    verdicts used it, and the content hash of every rule is kept so changes
+    made between runs are found by sync. The ads depending on a changed or
+    removed rule are queued straight from the index. A changed rule may also
+    start matching ads that did not use it before, so the local retrieval
+    step is re-run for the ads that share a term with a changed rule's new
+    text, found through a term index over the ads. An ad whose re-retrieved context hashes the same as its verdict's is
+    not sent to the LLM again. The queue is persisted with the store and
+    drained by reaudit_pending, either directly or from the background job
+    started by start_reaudit_job.
+    """
+    store_path: str = "verdict_store.json"
+    verdicts: Dict[str, Verdict] = {}
+    rule_index: Dict[str, List[str]] = {}
+    rule_hashes: Dict[str, str] = {}
+    pending_ads: List[str] = []
+    pending_rules: List[str] = []
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+    _term_index: Dict[str, Set[str]] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, **data):
+        super().__init__(**data)
+
+        if os.path.exists(self.store_path):
+            with open(self.store_path, 'r') as f:
+                state = json.load(f)
+            self.verdicts = {ad_id: Verdict(**v) for ad_id, v in state["verdicts"].items()}
+            self.rule_index = state["rule_index"]
+            self.rule_hashes = state["rule_hashes"]
+            self.pending_ads = state["pending_ads"]
+            self.pending_rules = state["pending_rules"]
+
+        for ad_id, verdict in self.verdicts.items():
+            self._index_terms(ad_id, verdict.input_text)
+
+    def save(self) -> None:
+        """Write verdicts, the reverse index and the re-audit queue to disk."""
+        with self._lock:
+            with open(self.store_path, 'w') as f:
+                json.dump(self.model_dump(exclude={"store_path"}), f, indent=2)
+
+    def watch(self, agent: BaseAgent) -> None:
+        """Queue re-audits whenever the agent's knowledge changes."""
+        agent.add_knowledge_listener(lambda rule_ids: self.sync(agent))
+
+    def sync(self, agent: BaseAgent) -> List[str]:
+        """Compare the agent's knowledge to the last seen version and queue re-audits.
+
+        Call this once the agent's corpus is fully loaded, before watch, to
+        pick up guideline changes made while the store was not watching.
+        Returns the ids of the rules that changed.
+        """
+        with self._lock:
+            current = _rule_hashes(agent)
+            changed = [r for r, h in current.items() if self.rule_hashes.get(r) != h]
+            changed += [r for r in self.rule_hashes if r not in current]
+            self.rule_hashes = current
+            if changed:
+                self.enqueue_reaudit(changed)
+            return changed
+
+    def audit(self, agent: BaseAgent, ad_id: str, input_text: str, save: bool = True) -> str:
+        """Evaluate an ad and record the verdict with its dependencies."""
+        response, examples = agent.process_input_with_sources(input_text)
+        self.record(ad_id, input_text, response, examples, save)
+        return response
+
+    def record(self, ad_id: str, input_text: str, response: str, examples: List[Dict[str, str]], save: bool = True) -> None:
+        """Store a verdict and index it under every rule it depended on."""
+        rule_ids = [knowledge_key(d) for d in examples]
+
+        with self._lock:
+            self._unindex(ad_id)
+            self.verdicts[ad_id] = Verdict(
+                ad_id=ad_id,
+                input_text=input_text,
+                verdict=response,
+                rule_ids=rule_ids,
+                context_hash=_context_hash(examples),
+                timestamp=datetime.now().isoformat()
+            )
+            for rule_id in rule_ids:
+                self.rule_index.setdefault(rule_id, []).append(ad_id)
+            self._index_terms(ad_id, input_text)
+            if save:
+                self.save()
+
+    def affected_ads(self, rule_ids: List[str]) -> List[str]:
+        """Return the ads whose verdicts depend on any of the given rules."""
+        affected = []
+        for rule_id in rule_ids:
+            for ad_id in self.rule_index.get(rule_id, []):
+                if ad_id not in affected:
+                    affected.append(ad_id)
+        return affected
+
+    def enqueue_reaudit(self, rule_ids: List[str]) -> None:
+        """Queue the ads affected by changed rules for re-evaluation."""
+        with self._lock:
+            for ad_id in self.affected_ads(rule_ids):
+                if ad_id not in self.pending_ads:
+                    self.pending_ads.append(ad_id)
+            # Verdicts recorded later already see the change, so only
+            # re-check retrieval when there are verdicts to re-check
+            if self.verdicts:
+                for rule_id in rule_ids:
+                    if rule_id not in self.pending_rules:
+                        self.pending_rules.append(rule_id)
+            self.save()
+
+    def reaudit_pending(self, agent: BaseAgent) -> List[str]:
+        """Re-evaluate every queued ad and return the ids that were re-audited.
+
+        The store is saved once for the whole batch rather than per ad.
+        """
+        with self._lock:
+            changed_rules = set(self.pending_rules)
+            self.pending_rules = []
+        if changed_rules:
+            try:
+                self._queue_newly_matching(agent, changed_rules)
+            except Exception:
+                # Keep the rules so the next run repeats the scan
+                with self._lock:
+                    self.pending_rules = sorted(changed_rules | set(self.pending_rules))
+                raise
+
+        reaudited = []
+        try:
+            while True:
+                # Pop before auditing so a change that arrives meanwhile queues the ad again
+                with self._lock:
+                    if not self.pending_ads:
+                        break
+                    ad_id = self.pending_ads.pop(0)
+                    verdict = self.verdicts.get(ad_id)
+                if verdict is None:
+                    continue
+
+                examples = agent.get_relevant_examples(verdict.input_text)
+                if _context_hash(examples) == verdict.context_hash:
+                    continue
+
+                try:
+                    self.audit(agent, ad_id, verdict.input_text, save=False)
+                    reaudited.append(ad_id)
+                except Exception as e:
+                    # Put the ad back so the next run retries it
+                    print(f"Error re-auditing {ad_id}: {str(e)}")
+                    with self._lock:
+                        if ad_id not in self.pending_ads:
+                            self.pending_ads.insert(0, ad_id)
+                    break
+        finally:
+            self.save()
+
+        return reaudited
+
+    def start_reaudit_job(self, agent: BaseAgent, interval: int = 60) -> threading.Event:
+        """Drain the re-audit queue in a background thread every interval seconds.
+
+        Returns an event that stops the job when set.
+        """
+        stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                try:
+                    reaudited = self.reaudit_pending(agent)
+                    if reaudited:
+                        print(f"Re-audited {len(reaudited)} ads: {', '.join(reaudited)}")
+                except Exception as e:
+                    print(f"Error in re-audit job: {str(e)}")
+                stop.wait(interval)
+
+        threading.Thread(target=run, name="verdict-reaudit", daemon=True).start()
+        return stop
+
+    def _queue_newly_matching(self, agent: BaseAgent, changed_rules: Set[str]) -> None:
+        """Queue ads whose retrieval now picks up a changed rule they did not use.
+
+        Only ads sharing a term with a changed rule can retrieve it, so just
+        those are re-checked, and retrieval runs without holding the lock.
+        """
+        changed_terms = set()
+        for d in agent.training_data:
+            if knowledge_key(d) in changed_rules:
+                changed_terms |= extract_terms(d["input"] + " " + d["output"])
+
+        with self._lock:
+            candidates = sorted({ad_id for t in changed_terms for ad_id in self._term_index.get(t, ())})
+            candidates = [
+                (ad_id, self.verdicts[ad_id].input_text, set(self.verdicts[ad_id].rule_ids))
+                for ad_id in candidates if ad_id not in self.pending_ads
+            ]
+
+        matching = []
+        for ad_id, input_text, rule_ids in candidates:
+            retrieved = {knowledge_key(d) for d in agent.get_relevant_examples(input_text)}
+            if (changed_rules & retrieved) - rule_ids:
+                matching.append(ad_id)
+
+        with self._lock:
+            for ad_id in matching:
+                if ad_id not in self.pending_ads:
+                    self.pending_ads.append(ad_id)
+
+    def _index_terms(self, ad_id: str, input_text: str) -> None:
+        """Index an ad under the terms of its input."""
+        for term in extract_terms(input_text):
+            self._term_index.setdefault(term, set()).add(ad_id)
+
+    def _unindex(self, ad_id: str) -> None:
+        """Drop an ad from the reverse and term index entries of its previous verdict."""
+        previous = self.verdicts.get(ad_id)
+        if previous is None:
+            return
+        for term in extract_terms(previous.input_text):
+            ads = self._term_index.get(term, set())
+            ads.discard(ad_id)
+            if not ads:
+                self._term_index.pop(term, None)
+        for rule_id in previous.rule_ids:
+            ads = self.rule_index.get(rule_id, [])
+            if ad_id in ads:
+                ads.remove(ad_id)
+            if not ads:
+                self.rule_index.pop(rule_id, None)
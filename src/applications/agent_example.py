@@ -4,10 +4,17 @@ import requests
 
 from dotenv import load_dotenv
 from ..agents.base_agent import BaseAgent
+from ..agents.guideline_ingestion import GuidelineIngestor
+from ..agents.verdict_store import VerdictStore
 
 # Load environment variables
 load_dotenv()
 
+GUIDELINES_PDF = os.path.join(
+    os.path.dirname(__file__), "..", "..",
+    "RSOC – Compliance Guidelines One-Pager Updated Jan 2025.pdf"
+)
+
 def main():
 
     print("Starting agent application...")
@@ -145,9 +152,25 @@ No other CTAs or variations are allowed."""
 
     # Train the agent with RSOC guidelines
     agent.train(training_data)
-    
+
     print("Agent trained successfully!")
 
+    # Ingest the authoritative guideline PDF into the retrieval corpus.
+    # Unchanged documents are skipped and edited ones only re-index changed rules.
+    print("Ingesting guideline documents...")
+    ingestor = GuidelineIngestor()
+    ingestor.load_corpus(agent)
+    changes = ingestor.ingest(GUIDELINES_PDF, agent, doc_id="rsoc")
+    print(f"Guidelines ingested: {len(changes['added'])} added, {len(changes['changed'])} changed, {len(changes['removed'])} removed")
+
+    # Queue re-audits only for stored verdicts whose guidelines changed
+    # since the last run, keep watching for further changes, and drain
+    # the queue in the background.
+    verdict_store = VerdictStore()
+    verdict_store.sync(agent)
+    verdict_store.watch(agent)
+    stop_reaudit = verdict_store.start_reaudit_job(agent, interval=60)
+
     """
     print("Testing agent...")
     # Test the agent with compliance-related questions
@@ -199,7 +222,7 @@ List specific violations if any exist, or confirm compliance if no issues are fo
 
     # Process the compliance check
     print("\nSubmitting ad for compliance check...")
-    compliance_response = agent.process_input(compliance_check_prompt)
+    compliance_response = verdict_store.audit(agent, "solar-payback", compliance_check_prompt)
     print(f"\nCompliance Check Results:\n{compliance_response}")
     
     # Example of extracting text from images
@@ -221,6 +244,7 @@ List specific violations if any exist, or confirm compliance if no issues are fo
     """
     
     # Save agent state
+    stop_reaudit.set()
     agent.save_state() # fix to actually save the state up to 50 latest messages (potentially divided into about 5 prompts)
     print("\nAgent state saved successfully!")
 
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from agents.base_agent import BaseAgent
+
+
+class FakeResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeLLM:
+    """Records prompts instead of calling the OpenAI API."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, messages):
+        self.calls.append(messages)
+        return FakeResponse("compliant")
+
+
+@pytest.fixture
+def make_agent(monkeypatch):
+    """Build agents with a fake LLM, e.g. to simulate a restart."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    def make():
+        agent = BaseAgent(name="TestAgent")
+        agent.llm = FakeLLM()
+        return agent
+
+    return make
+
+
+@pytest.fixture
+def agent(make_agent):
+    return make_agent()
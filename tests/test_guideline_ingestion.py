@@ -0,0 +1,141 @@
+import os
+import string
+
+import pytest
+
+from agents import guideline_ingestion
+from agents.guideline_ingestion import GuidelineIngestor, chunk_guidelines
+
+RSOC_PDF = os.path.join(
+    os.path.dirname(__file__), "..",
+    "RSOC – Compliance Guidelines One-Pager Updated Jan 2025.pdf"
+)
+
+REFERRING_ADS_RULES = [
+    "Ad must not include a specific salary or hourly pay expectation.",
+    "Ad must not falsely offer a free service.",
+    "Ad must not claim a false timeline or level of effort.",
+    "Ad language should be consistent across text and image.",
+]
+
+CTA_RULES = ['"Learn More"', '"Explore More"', '"See Options"']
+
+
+def guideline_text(referring_rules=REFERRING_ADS_RULES):
+    """Build a two-page guideline document with a repeated header."""
+    def section(number, title, rules):
+        lines = [f"{number}. {title}"]
+        lines += [f"{string.ascii_lowercase[i]}. {rule}" for i, rule in enumerate(rules)]
+        return "\n".join(lines)
+
+    page_one = "Confidential\n" + section(2, "Examples of what we cannot say or do on Referring Ads:", referring_rules)
+    page_two = "Confidential\n" + section(4, "Examples of Acceptable CTA's allowed on Ad Creatives:", CTA_RULES)
+    return page_one + "\f" + page_two
+
+
+def test_chunks_by_section_and_rule_without_page_headers():
+    chunks = {c.chunk_id: c for c in chunk_guidelines(guideline_text(), "rsoc")}
+
+    assert chunks["rsoc#2.a"].content == REFERRING_ADS_RULES[0]
+    assert chunks["rsoc#2.d"].content == REFERRING_ADS_RULES[3]
+    assert chunks["rsoc#4.c"].content == '"See Options"'
+    assert not any("Confidential" in c.content for c in chunks.values())
+
+
+def test_rule_specific_query_retrieves_its_chunk(agent, tmp_path):
+    ingestor = GuidelineIngestor(index_path=str(tmp_path / "index.json"))
+    ingestor.ingest_text(guideline_text(), agent, "rsoc")
+
+    examples = agent.get_relevant_examples("Earn a great hourly salary")
+
+    assert examples[0]["chunk_id"] == "rsoc#2.a"
+
+
+def test_reingesting_unchanged_text_touches_nothing(agent, tmp_path):
+    ingestor = GuidelineIngestor(index_path=str(tmp_path / "index.json"))
+    ingestor.ingest_text(guideline_text(), agent, "rsoc")
+
+    changes = ingestor.ingest_text(guideline_text(), agent, "rsoc")
+
+    assert changes == {"added": [], "changed": [], "removed": []}
+
+
+def test_edited_rule_is_the_only_change(agent, tmp_path):
+    ingestor = GuidelineIngestor(index_path=str(tmp_path / "index.json"))
+    ingestor.ingest_text(guideline_text(), agent, "rsoc")
+    edited = REFERRING_ADS_RULES[:1] + ["Ad must not offer a free service."] + REFERRING_ADS_RULES[2:]
+
+    changes = ingestor.ingest_text(guideline_text(edited), agent, "rsoc")
+
+    assert changes == {"added": [], "changed": ["rsoc#2.b"], "removed": []}
+    chunk = next(d for d in agent.training_data if d["chunk_id"] == "rsoc#2.b")
+    assert chunk["input"] == "Ad must not offer a free service."
+
+
+def test_inserted_rule_does_not_change_the_rules_after_it(agent, tmp_path):
+    ingestor = GuidelineIngestor(index_path=str(tmp_path / "index.json"))
+    ingestor.ingest_text(guideline_text(), agent, "rsoc")
+    inserted = REFERRING_ADS_RULES[:1] + ["Ad must not mention cryptocurrency."] + REFERRING_ADS_RULES[1:]
+
+    changes = ingestor.ingest_text(guideline_text(inserted), agent, "rsoc")
+
+    assert len(changes["added"]) == 1
+    assert changes["changed"] == []
+    assert changes["removed"] == []
+
+
+def test_removed_rule_is_dropped_from_the_corpus(agent, tmp_path):
+    ingestor = GuidelineIngestor(index_path=str(tmp_path / "index.json"))
+    ingestor.ingest_text(guideline_text(), agent, "rsoc")
+
+    changes = ingestor.ingest_text(guideline_text(REFERRING_ADS_RULES[1:]), agent, "rsoc")
+
+    assert changes == {"added": [], "changed": [], "removed": ["rsoc#2.a"]}
+    assert "rsoc#2.a" not in {d.get("chunk_id") for d in agent.training_data}
+
+
+def test_removed_document_is_dropped_from_index_and_corpus(agent, tmp_path):
+    ingestor = GuidelineIngestor(index_path=str(tmp_path / "index.json"))
+    ingestor.ingest_text(guideline_text(), agent, "rsoc")
+
+    removed = ingestor.remove_document("rsoc", agent)
+
+    assert "rsoc#2.a" in removed
+    assert "rsoc" not in GuidelineIngestor(index_path=ingestor.index_path).index
+    assert not any(d.get("chunk_id", "").startswith("rsoc#") for d in agent.training_data)
+
+
+def test_ingests_the_rsoc_pdf(agent, tmp_path):
+    ingestor = GuidelineIngestor(index_path=str(tmp_path / "index.json"))
+
+    changes = ingestor.ingest(RSOC_PDF, agent, "rsoc")
+
+    chunks = {d["chunk_id"]: d for d in agent.training_data}
+    assert set(changes["added"]) == set(chunks)
+    assert chunks["rsoc#2.a"]["input"] == "Ad must not include a specific salary or hourly pay expectation."
+    assert "See Options" in chunks["rsoc#4.f"]["input"]
+    assert not any("Confidential" in d["input"] for d in chunks.values())
+
+
+def test_unchanged_pdf_is_skipped_without_parsing(agent, tmp_path, monkeypatch):
+    ingestor = GuidelineIngestor(index_path=str(tmp_path / "index.json"))
+    ingestor.ingest(RSOC_PDF, agent, "rsoc")
+
+    def fail(pdf_path):
+        pytest.fail("unchanged PDF was parsed again")
+
+    monkeypatch.setattr(guideline_ingestion, "extract_pdf_text", fail)
+
+    assert ingestor.ingest(RSOC_PDF, agent, "rsoc") == {"added": [], "changed": [], "removed": []}
+
+
+def test_load_corpus_restores_chunks_after_restart(agent, make_agent, tmp_path):
+    index_path = str(tmp_path / "index.json")
+    GuidelineIngestor(index_path=index_path).ingest(RSOC_PDF, agent, "rsoc")
+
+    restarted = make_agent()
+    GuidelineIngestor(index_path=index_path).load_corpus(restarted)
+
+    chunks = {d["chunk_id"]: d for d in restarted.training_data}
+    assert chunks["rsoc#2.a"] == next(d for d in agent.training_data if d["chunk_id"] == "rsoc#2.a")
+    assert "rsoc#4.f" in chunks
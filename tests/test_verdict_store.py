@@ -0,0 +1,216 @@
+import time
+
+import pytest
+
+from agents.base_agent import BaseAgent
+from agents.verdict_store import VerdictStore, _context_hash
+
+RULES = {
+    "rsoc#2.a": "Ad must not include a specific salary or hourly pay expectation.",
+    "rsoc#2.k": "Ad should not make false or misleading health or wellness claims.",
+    "rsoc#3.g": "Do not create a false sense of urgency such as 'act now' or 'supply is limited'.",
+    "rsoc#4.a": "Acceptable CTA: 'Learn More'.",
+    "rsoc#4.b": "Acceptable CTA: 'See Options'.",
+}
+
+ADS = {
+    "salary": "Earn a great hourly salary from home",
+    "wellness": "This tea is a miracle for your health and wellness",
+    "urgency": "Act now, supply is limited",
+    "cta": "Is the Buy Today CTA acceptable?",
+}
+
+
+def set_rule(agent, rule_id, text):
+    agent.update_knowledge_chunks({rule_id: {"input": text, "output": "RSOC guideline"}})
+
+
+@pytest.fixture
+def store(agent, tmp_path):
+    for rule_id, text in RULES.items():
+        set_rule(agent, rule_id, text)
+    store = VerdictStore(store_path=str(tmp_path / "verdicts.json"))
+    store.sync(agent)
+    store.watch(agent)
+    for ad_id, text in ADS.items():
+        store.audit(agent, ad_id, text)
+    return store
+
+
+def test_verdicts_depend_on_their_own_rules(store):
+    assert store.verdicts["salary"].rule_ids[0] == "rsoc#2.a"
+    assert store.verdicts["cta"].rule_ids[0] in ("rsoc#4.a", "rsoc#4.b")
+    assert store.affected_ads(["rsoc#2.k"]) == ["wellness"]
+
+
+def test_one_rule_change_reaudits_only_its_dependents(agent, store):
+    agent.llm.calls.clear()
+
+    set_rule(agent, "rsoc#2.a", "Ad must not promise a specific salary or hourly wage.")
+
+    assert store.pending_ads == ["salary"]
+    assert store.reaudit_pending(agent) == ["salary"]
+    assert len(agent.llm.calls) == 1
+
+
+def test_changed_rule_that_now_matches_another_ad_queues_it(agent, store):
+    set_rule(agent, "rsoc#2.a", "Ad must not promise hourly pay or a miracle tea for your health.")
+
+    reaudited = store.reaudit_pending(agent)
+
+    assert "wellness" in reaudited
+    assert "rsoc#2.a" in store.verdicts["wellness"].rule_ids
+
+
+def test_reverted_change_skips_the_llm(agent, store):
+    agent.llm.calls.clear()
+
+    set_rule(agent, "rsoc#2.a", "Ad must not promise a specific salary.")
+    set_rule(agent, "rsoc#2.a", RULES["rsoc#2.a"])
+
+    assert store.reaudit_pending(agent) == []
+    assert agent.llm.calls == []
+
+
+def test_change_during_reaudit_queues_the_ad_again(agent, store):
+    respond = agent.llm
+
+    def change_rule_mid_audit(messages):
+        agent.llm = respond
+        set_rule(agent, "rsoc#2.a", "Ad must not mention any salary or hourly pay at all.")
+        return respond(messages)
+
+    set_rule(agent, "rsoc#2.a", "Ad must not promise a specific salary or hourly wage.")
+    agent.llm = change_rule_mid_audit
+
+    assert store.reaudit_pending(agent) == ["salary", "salary"]
+    assert store.pending_ads == []
+    current = agent.get_relevant_examples(ADS["salary"])
+    assert store.verdicts["salary"].context_hash == _context_hash(current)
+
+
+def test_reaudit_saves_once_per_batch(agent, store, monkeypatch):
+    set_rule(agent, "rsoc#4.a", "Acceptable CTA: 'Learn More' only.")
+    set_rule(agent, "rsoc#4.b", "Acceptable CTA: 'See Options' only.")
+    saves = []
+    monkeypatch.setattr(VerdictStore, "save", lambda self: saves.append(self))
+
+    store.reaudit_pending(agent)
+
+    assert len(saves) == 1
+
+
+def test_store_reloads_pending_queue(agent, store):
+    set_rule(agent, "rsoc#2.k", "Ad should not make any health claims.")
+
+    reloaded = VerdictStore(store_path=store.store_path)
+
+    assert reloaded.pending_ads == ["wellness"]
+    assert reloaded.rule_index["rsoc#2.k"] == ["wellness"]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_reaudit_job_drains_queue_in_background(agent, store):
+    stop = store.start_reaudit_job(agent, interval=0.01)
+    try:
+        set_rule(agent, "rsoc#2.k", "Ad should not make any health claims.")
+
+        current = agent.get_relevant_examples(ADS["wellness"])
+        assert wait_for(lambda: store.verdicts["wellness"].context_hash == _context_hash(current))
+        assert store.pending_ads == []
+    finally:
+        stop.set()
+
+
+def test_reaudit_job_survives_errors(agent, store, monkeypatch):
+    calls = []
+
+    def flaky_reaudit(self, agent):
+        calls.append(agent)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return []
+
+    monkeypatch.setattr(VerdictStore, "reaudit_pending", flaky_reaudit)
+    stop = store.start_reaudit_job(agent, interval=0.01)
+    try:
+        assert wait_for(lambda: len(calls) >= 2)
+    finally:
+        stop.set()
+
+
+def test_scan_only_rechecks_ads_sharing_a_term(agent, store, monkeypatch):
+    set_rule(agent, "rsoc#3.g", "Do not create a false sense of urgency such as 'act now' or 'hurry'.")
+    checked = []
+    retrieve = BaseAgent.get_relevant_examples
+
+    def counting_retrieve(self, input_text, *args, **kwargs):
+        checked.append(input_text)
+        return retrieve(self, input_text, *args, **kwargs)
+
+    monkeypatch.setattr(BaseAgent, "get_relevant_examples", counting_retrieve)
+
+    store.reaudit_pending(agent)
+
+    assert ADS["salary"] not in checked
+    assert ADS["urgency"] in checked
+
+
+def test_sync_finds_changes_made_while_not_watching(make_agent, tmp_path):
+    store_path = str(tmp_path / "verdicts.json")
+    agent = make_agent()
+    for rule_id, text in RULES.items():
+        set_rule(agent, rule_id, text)
+    store = VerdictStore(store_path=store_path)
+    store.sync(agent)
+    for ad_id, text in ADS.items():
+        store.audit(agent, ad_id, text)
+
+    restarted = make_agent()
+    for rule_id, text in RULES.items():
+        set_rule(restarted, rule_id, text)
+    set_rule(restarted, "rsoc#2.a", "Ad must not promise a specific salary or hourly wage.")
+    reopened = VerdictStore(store_path=store_path)
+
+    assert reopened.sync(restarted) == ["rsoc#2.a"]
+    assert reopened.pending_ads == ["salary"]
+
+
+def test_reinjected_knowledge_replaces_entry_and_queues_dependents(agent, tmp_path):
+    topic = "What are the acceptable CTAs for RSOC ad creatives?"
+    agent.inject_knowledge(topic, "", topic, "Only 'Learn More' and 'Explore More' are acceptable CTAs.")
+    agent.inject_knowledge("What are the rules for landing pages?", "", "", "Landing pages cannot use sticky ads.")
+    store = VerdictStore(store_path=str(tmp_path / "verdicts.json"))
+    store.sync(agent)
+    store.watch(agent)
+    store.audit(agent, "cta", ADS["cta"])
+    store.audit(agent, "sticky", "Sticky ads on landing pages")
+    assert f"knowledge:{topic}" in store.verdicts["cta"].rule_ids
+
+    agent.inject_knowledge(topic, "", topic, "Only 'Learn More' and 'See Options' are acceptable CTAs.")
+
+    entries = [d for d in agent.training_data if d["chunk_id"] == f"knowledge:{topic}"]
+    assert len(entries) == 1
+    assert "See Options" in entries[0]["output"]
+    assert store.pending_ads == ["cta"]
+
+
+def test_trained_examples_notify_the_store(agent, store):
+    agent.train([{"input": "Is a miracle health tea ad acceptable?", "output": "No, it makes wellness claims."}])
+
+    store.reaudit_pending(agent)
+
+    assert any(r.startswith("example:") for r in store.verdicts["wellness"].rule_ids)
+
+
+def test_listeners_are_not_model_data(agent, store):
+    assert "knowledge_listeners" not in agent.model_dump()
+    assert "_knowledge_listeners" not in agent.model_dump()